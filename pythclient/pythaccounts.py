@@ -1,12 +1,18 @@
 from __future__ import annotations
 from typing import List, Dict, Tuple, Optional, Any, ClassVar
-import base64
 from enum import Enum
 from dataclasses import dataclass, field
+import functools
 import struct
 
 from loguru import logger
 
+try:
+    # SIMD-accelerated decoder, see the "speedups" extra
+    from pybase64 import b64decode
+except ImportError:
+    from base64 import b64decode
+
 from . import exceptions
 from .solana import SolanaPublicKey, SolanaPublicKeyOrStr, SolanaClient, SolanaAccount
 
@@ -14,9 +20,18 @@ from .solana import SolanaPublicKey, SolanaPublicKeyOrStr, SolanaClient, SolanaA
 _MAGIC = 0xA1B2C3D4
 _VERSION_1 = 1
 _VERSION_2 = 2
-_SUPPORTED_VERSIONS = set((_VERSION_1, _VERSION_2))
+_SUPPORTED_VERSIONS = frozenset((_VERSION_1, _VERSION_2))
 _ACCOUNT_HEADER_BYTES = 16  # magic + version + type + size, u32 * 4
 _NULL_KEY_BYTES = b'\x00' * SolanaPublicKey.LENGTH
+_HEADER = struct.Struct("<IIII")
+_MAPPING = struct.Struct("<II32s")  # 32 == SolanaPublicKey.LENGTH
+_PRICE_INFO = struct.Struct("<qQIIQ")
+# publisher key followed by two price infos (see PythPriceComponent)
+_PRICE_COMPONENT = struct.Struct("<32sqQIIQqQIIQ")
+# price account header up to and including the aggregator key
+# (see PythPriceAccount.update_from for the field layout)
+_V2_HEADER = struct.Struct("<IiIIQQ6qqQ32s32s32s")
+_V1_HEADER = struct.Struct("<IiIIQQ32s32s32s")
 MAX_SLOT_DIFFERENCE = 25
 
 
@@ -39,6 +54,11 @@ class PythPriceType(Enum):
     PRICE = 1
 
 
+# plain dict lookups are much cheaper than calling the Enum classes when parsing
+_STATUS_BY_INT = dict((status.value, status) for status in PythPriceStatus)
+_TYPE_BY_INT = dict((type_.value, type_) for type_ in PythPriceType)
+
+
 # Join exponential moving average for EMA price and EMA confidence
 class EmaType(Enum):
     UNKNOWN = 0
@@ -50,17 +70,35 @@ class EmaType(Enum):
     EMA_CONFIDENCE_DENOMINATOR = 6
 
 
+_SCALE_CACHE: Dict[int, float] = {}
+
+
+def _scale(exponent: int) -> float:
+    # 10 ** exponent, cached as only a few distinct exponents are ever seen
+    scale = _SCALE_CACHE.get(exponent)
+    if scale is None:
+        scale = _SCALE_CACHE[exponent] = 10 ** exponent
+    return scale
+
+
 def _check_base64(format: str):
     # Solana should return base64 by default, but add a sanity check..
     if format != "base64":
         raise Exception(f"unexpected data type from Solana: {format}")
 
 
+@functools.lru_cache(maxsize=8192)
+def _cached_public_key(key: bytes) -> SolanaPublicKey:
+    # the same publisher, product and price keys are seen on every refresh;
+    # reusing the (immutable) key objects skips the base58 encoding
+    return SolanaPublicKey(key)
+
+
 def _read_public_key_or_none(buffer: bytes, offset: int = 0) -> Optional[SolanaPublicKey]:
     buffer = buffer[offset:offset + SolanaPublicKey.LENGTH]
     if buffer == _NULL_KEY_BYTES:
         return None
-    return SolanaPublicKey(buffer)
+    return _cached_public_key(buffer)
 
 
 def _read_attribute_string(buffer: bytes, offset: int) -> Tuple[Optional[str], int]:
@@ -78,18 +116,19 @@ def _read_attribute_string(buffer: bytes, offset: int) -> Tuple[Optional[str], i
 
 
 def _parse_header(buffer: bytes, offset: int = 0, *, key: SolanaPublicKeyOrStr):
-    if len(buffer) - offset < _ACCOUNT_HEADER_BYTES:
+    buffer_len = len(buffer)
+    if buffer_len - offset < _ACCOUNT_HEADER_BYTES:
         raise ValueError("Pyth account data too short")
 
     # Pyth magic (u32) == MAGIC
     # version (u32) == VERSION_1 or 2
     # account type (u32)
     # account data size (u32)
-    magic, version, type_, size = struct.unpack_from("<IIII", buffer, offset)
+    magic, version, type_, size = _HEADER.unpack_from(buffer, offset)
 
-    if len(buffer) < size:
+    if buffer_len < size:
         raise ValueError(
-            f"{key} Pyth header says data is {size} bytes, but buffer only has {len(buffer)} bytes")
+            f"{key} Pyth header says data is {size} bytes, but buffer only has {buffer_len} bytes")
 
     if magic != _MAGIC:
         raise ValueError(
@@ -130,7 +169,7 @@ class PythAccount(SolanaAccount):
             raise ValueError(f"invalid account data response from Solana for key {self.key}: {value}")
         data_base64, data_format = value["data"]
         _check_base64(data_format)
-        data = base64.b64decode(data_base64)
+        data = b64decode(data_base64)
         type_, size, version = _parse_header(data, 0, key=self.key)
         class_ = _ACCOUNT_TYPE_TO_CLASS.get(type_, None)
         if class_ is not type(self):
@@ -169,23 +208,22 @@ class PythMappingAccount(PythAccount):
             unused (u32)
             next mapping account key (char[32])
         """
-        fmt = "<II32s"  # 32 == SolanaPublicKey.LENGTH
-
-        num_entries, _, next_account_key_bytes = struct.unpack_from(
-            fmt, buffer, offset)
+        num_entries, _, next_account_key_bytes = _MAPPING.unpack_from(
+            buffer, offset)
         next_account_key = _read_public_key_or_none(next_account_key_bytes)
 
         # product account keys (char[32] * number of products)
-        offset += struct.calcsize(fmt)
+        offset += _MAPPING.size
         entries: List[SolanaPublicKey] = []
+        key_length = SolanaPublicKey.LENGTH
         for _ in range(num_entries):
-            new_key = SolanaPublicKey(buffer[offset:offset + SolanaPublicKey.LENGTH])
+            key_bytes = buffer[offset:offset + key_length]
             # ignore null keys..
-            if new_key != SolanaPublicKey.NULL_KEY:
-                entries.append(SolanaPublicKey(buffer[offset:offset + SolanaPublicKey.LENGTH]))
+            if key_bytes != _NULL_KEY_BYTES:
+                entries.append(_cached_public_key(key_bytes))
             else:
                 logger.warning("null key seen in mapping account {}", self.key)
-            offset += SolanaPublicKey.LENGTH
+            offset += key_length
 
         self.entries: List[SolanaPublicKey] = entries
         self.next_account_key = next_account_key
@@ -250,13 +288,25 @@ class PythProductAccount(PythAccount):
     async def refresh_prices(self) -> Dict[PythPriceType, PythPriceAccount]:
         """
         Refreshes the price accounts of this product.
+
+        Price accounts that were already loaded are fetched together in a
+        single request; only accounts new to the list are fetched one by one.
         """
 
+        prefetched: Dict[SolanaPublicKey, PythPriceAccount] = {}
+        if self._prices:
+            prefetched = dict(
+                (price.key, PythPriceAccount(price.key, self.solana, product=self))
+                for price in self._prices.values())
+            await self.solana.update_accounts(list(prefetched.values()))
+
         prices: Dict[PythPriceType, PythPriceAccount] = {}
         key = self.first_price_account_key
         while key:
-            price: PythPriceAccount = PythPriceAccount(key, self.solana, product=self)
-            await price.update()
+            price = prefetched.pop(key, None)
+            if price is None:
+                price = PythPriceAccount(key, self.solana, product=self)
+                await price.update()
             prices[price.price_type] = price
             key = price.next_price_account_key
         self._prices = prices
@@ -340,7 +390,7 @@ class PythProductAccount(PythAccount):
             value, offset = _read_attribute_string(buffer, offset)
             attrs[key] = value
 
-        self.first_price_account_key = SolanaPublicKey(first_price_account_key_bytes)
+        self.first_price_account_key = _cached_public_key(first_price_account_key_bytes)
         if self.first_price_account_key == SolanaPublicKey.NULL_KEY:
             self.first_price_account_key = None
             self._prices = {}
@@ -390,10 +440,16 @@ class PythPriceInfo:
     price: float = field(init=False)
     confidence_interval: float = field(init=False)
 
-    def __post_init__(self):
-        self.price = self.raw_price * (10 ** self.exponent)
-        self.confidence_interval = self.raw_confidence_interval * \
-            (10 ** self.exponent)
+    def __getattr__(self, name: str) -> Any:
+        # price and confidence_interval are only computed (and then stored) on
+        # first access, as most component price infos are never read
+        if name == "price":
+            self.price = self.raw_price * _scale(self.exponent)
+            return self.price
+        if name == "confidence_interval":
+            self.confidence_interval = self.raw_confidence_interval * _scale(self.exponent)
+            return self.confidence_interval
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
 
     @staticmethod
     def deserialise(buffer: bytes, offset: int = 0, *, exponent: int) -> PythPriceInfo:
@@ -408,9 +464,10 @@ class PythPriceInfo:
             slot (u64)
         """
         # _ is corporate_action
-        price, confidence_interval, price_status, _, pub_slot = struct.unpack_from(
-            "<qQIIQ", buffer, offset)
-        return PythPriceInfo(price, confidence_interval, PythPriceStatus(price_status), pub_slot, exponent)
+        price, confidence_interval, price_status, _, pub_slot = _PRICE_INFO.unpack_from(
+            buffer, offset)
+        return PythPriceInfo(
+            price, confidence_interval, _STATUS_BY_INT.get(price_status, PythPriceStatus.UNKNOWN), pub_slot, exponent)
 
     def __str__(self) -> str:
         return f"PythPriceInfo status {self.price_status} price {self.price}"
@@ -432,6 +489,18 @@ class PythPriceInfo:
 
 
 
+_EMPTY_PRICE_INFOS: Dict[int, PythPriceInfo] = {}
+
+
+def _empty_price_info(exponent: int) -> PythPriceInfo:
+    # shared, read-only price info for component prices that were never
+    # published (all fields zero)
+    price_info = _EMPTY_PRICE_INFOS.get(exponent)
+    if price_info is None:
+        price_info = _EMPTY_PRICE_INFOS[exponent] = PythPriceInfo(0, 0, PythPriceStatus.UNKNOWN, 0, exponent)
+    return price_info
+
+
 @dataclass
 class PythPriceComponent:
     """
@@ -465,15 +534,8 @@ class PythPriceComponent:
             contributing price to last aggregate (PythPriceInfo)
             latest contributing price (PythPriceInfo)
         """
-        key = _read_public_key_or_none(buffer, offset)
-        if key is None:
-            return None
-        offset += SolanaPublicKey.LENGTH
-        last_aggregate_price = PythPriceInfo.deserialise(
-            buffer, offset, exponent=exponent)
-        offset += PythPriceInfo.LENGTH
-        latest_price = PythPriceInfo.deserialise(buffer, offset, exponent=exponent)
-        return PythPriceComponent(key, last_aggregate_price, latest_price, exponent)
+        components = _parse_price_components(buffer, offset, 1, exponent=exponent, share_empty_price_info=False)
+        return components[0] if components else None
 
     def to_json(self):
 
@@ -485,6 +547,48 @@ class PythPriceComponent:
         }
 
 
+def _parse_price_components(
+    buffer: bytes, offset: int, num_components: int, *, exponent: int, share_empty_price_info: bool = True
+) -> List[PythPriceComponent]:
+    # Parses up to num_components components, stopping at the first null
+    # publisher key. The whole block is unpacked with a single iter_unpack and
+    # the loop body is kept inline, as this runs for every component of every
+    # price account. Unless share_empty_price_info is False, price infos that
+    # were never published are a shared, read-only instance per exponent.
+    end = offset + num_components * _PRICE_COMPONENT.size
+    if len(buffer) < end:
+        raise ValueError(
+            f"Pyth price account data has {num_components} price components, but buffer only has {len(buffer)} bytes")
+    price_components: List[PythPriceComponent] = []
+    # sparse components often carry price infos that were never published
+    empty_price_info = _empty_price_info(exponent)
+    # attribute and global lookups hoisted out of the loop
+    append = price_components.append
+    status_by_int = _STATUS_BY_INT.get
+    unknown = PythPriceStatus.UNKNOWN
+    null_key = _NULL_KEY_BYTES
+    for (key, price, confidence_interval, price_status, _, pub_slot,
+         latest_price, latest_confidence_interval, latest_price_status, _, latest_pub_slot
+         ) in _PRICE_COMPONENT.iter_unpack(memoryview(buffer)[offset:end]):
+        if key == null_key:
+            break
+        if price or confidence_interval or price_status or pub_slot or not share_empty_price_info:
+            last_aggregate_price_info = PythPriceInfo(
+                price, confidence_interval, status_by_int(price_status, unknown), pub_slot, exponent)
+        else:
+            last_aggregate_price_info = empty_price_info
+        if (latest_price or latest_confidence_interval or latest_price_status or latest_pub_slot
+                or not share_empty_price_info):
+            latest_price_info = PythPriceInfo(
+                latest_price, latest_confidence_interval, status_by_int(latest_price_status, unknown),
+                latest_pub_slot, exponent)
+        else:
+            latest_price_info = empty_price_info
+        append(PythPriceComponent(
+            _cached_public_key(key), last_aggregate_price_info, latest_price_info, exponent))
+    return price_components
+
+
 class PythPriceAccount(PythAccount):
     """
     Represents a price account, which contains price data of a particular type
@@ -570,8 +674,6 @@ class PythPriceAccount(PythAccount):
             price type (u32 PythPriceType)
             exponent (i32)
             number of component prices (u32)
-                (? unclear if this is supposed to match the number of
-                    PythPriceComponents below)
             unused (u32)
             currently accumulating price slot (u64)
             slot of current aggregate price (u64)
@@ -584,23 +686,22 @@ class PythPriceAccount(PythAccount):
             price components (PythPriceComponent[up to 16 (v1) / up to 32 (v2)])
         """
         if version == _VERSION_2:
-            price_type, exponent, num_components = struct.unpack_from("<IiI", buffer, offset)
-            offset += 16  # struct.calcsize("IiII") (last I is the number of quoters that make up the aggregate)
-            last_slot, valid_slot = struct.unpack_from("<QQ", buffer, offset)
-            offset += 16  # QQ
-            derivations = list(struct.unpack_from("<6q", buffer, offset))
+            fields = _V2_HEADER.unpack_from(buffer, offset)
+            # fields[3] is the number of quoters that make up the aggregate
+            price_type, exponent, num_components = fields[:3]
+            last_slot, valid_slot = fields[4:6]
+            derivations = fields[6:12]
             self.derivations = dict((type_, derivations[type_.value - 1]) for type_ in [EmaType.EMA_CONFIDENCE_VALUE, EmaType.EMA_PRICE_VALUE])
-            offset += 48  # 6q
             # All drv*_ fields sans min_publishers are currently unused
-            _, min_publishers = struct.unpack_from("<qQ", buffer, offset)
-            offset += 16  # <qQ
-            product_account_key_bytes, next_price_account_key_bytes = struct.unpack_from("32s32s", buffer, offset)
-            offset += 96  # 32s32s32s
+            min_publishers = fields[13]
+            product_account_key_bytes, next_price_account_key_bytes = fields[14:16]
+            offset += _V2_HEADER.size
         elif version == _VERSION_1:
-            price_type, exponent, num_components, _, last_slot, valid_slot, product_account_key_bytes, next_price_account_key_bytes, aggregator_key_bytes = struct.unpack_from(
-                "<IiIIQQ32s32s32s", buffer, offset)
+            price_type, exponent, num_components, _, last_slot, valid_slot, product_account_key_bytes, next_price_account_key_bytes, aggregator_key_bytes = _V1_HEADER.unpack_from(
+                buffer, offset)
             self.derivations = {}
-            offset += 128  # struct.calcsize("<IiIIQQ32s32s32s")
+            min_publishers = None
+            offset += _V1_HEADER.size
         else:
             assert False
 
@@ -609,23 +710,15 @@ class PythPriceAccount(PythAccount):
             buffer, offset, exponent=exponent)
 
         # price components (PythPriceComponent[up to 16 (v1) / up to 32 (v2)])
-        price_components: List[PythPriceComponent] = []
         offset += PythPriceInfo.LENGTH
-        buffer_len = len(buffer)
-        while offset < buffer_len:
-            component = PythPriceComponent.deserialise(
-                buffer, offset, exponent=exponent)
-            if not component:
-                break
-            price_components.append(component)
-            offset += PythPriceComponent.LENGTH
+        price_components = _parse_price_components(buffer, offset, num_components, exponent=exponent)
 
-        self.price_type = PythPriceType(price_type)
+        self.price_type = _TYPE_BY_INT.get(price_type, PythPriceType.UNKNOWN)
         self.exponent = exponent
         self.num_components = num_components
         self.last_slot = last_slot
         self.valid_slot = valid_slot
-        self.product_account_key = SolanaPublicKey(product_account_key_bytes)
+        self.product_account_key = _cached_public_key(product_account_key_bytes)
         self.next_price_account_key = _read_public_key_or_none(
             next_price_account_key_bytes)
         self.aggregate_price_info = aggregate_price_info
@@ -160,11 +160,40 @@ class PythClient:
     async def get_all_accounts(self) -> List[PythAccount]:
         accounts: List[PythAccount] = []
         accounts.extend(await self.get_mapping_accounts())
-        for product in await self.get_products():
+        products = await self.get_products()
+        await self._load_missing_prices([product for product in products if not _prices_loaded(product)])
+        for product in products:
             accounts.append(product)
             accounts.extend((await product.get_prices()).values())
         return accounts
 
+    async def _load_missing_prices(self, products: List[PythProductAccount]) -> None:
+        # Walks the price account lists of the given products together, one
+        # getMultipleAccounts call per position in the lists. Products whose
+        # list cannot be used are left unloaded, so get_prices falls back to
+        # loading them on their own.
+        tuples: List[Tuple[PythProductAccount, List[PythPriceAccount], PythPriceAccount]] = [
+            (product, [], PythPriceAccount(product.first_price_account_key, self.solana, product=product))
+            for product in products
+            if product.first_price_account_key is not None
+        ]
+
+        while len(tuples) > 0:
+            await self.solana.update_accounts([price for _, _, price in tuples])
+
+            next_tuples: List[Tuple[PythProductAccount, List[PythPriceAccount], PythPriceAccount]] = []
+            for product, prices, price in tuples:
+                prices.append(price)
+                if price.next_price_account_key:
+                    next_price = PythPriceAccount(price.next_price_account_key, self.solana, product=product)
+                    next_tuples.append((product, prices, next_price))
+                else:
+                    try:
+                        product.use_price_accounts(prices)
+                    except ValueError as ex:
+                        logger.exception("error while loading prices of {}", product.key, exception=ex)
+            tuples = next_tuples
+
     @backoff.on_exception(
         backoff.fibo,
         (aiohttp.ClientError, exceptions.RateLimitedException),
@@ -206,12 +235,20 @@ class PythClient:
         new_accounts = dict((product.key, product) for product in [*self._mapping_accounts, *self._products])
         added_keys = new_accounts.keys() - old_accounts.keys()
         removed_keys = old_accounts.keys() - new_accounts.keys()
-        for new_key in added_keys:
-            await new_accounts[new_key].update()
+        if added_keys:
+            await self.solana.update_accounts([new_accounts[new_key] for new_key in added_keys])
 
         return list(new_accounts[key] for key in added_keys), list(old_accounts[key] for key in removed_keys)
 
 
+def _prices_loaded(product: PythProductAccount) -> bool:
+    try:
+        product.prices
+    except exceptions.NotLoadedException:
+        return False
+    return True
+
+
 def _WatchSession_reconnect_giveup(e: BaseException):
     return isinstance(e, asyncio.CancelledError)
 
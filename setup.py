@@ -27,6 +27,7 @@ setup(
     extras_require={
         'testing': requirements + ['mock', 'pytest', 'pytest-cov', 'pytest-socket',
                                    'pytest-mock', 'pytest-asyncio'],
+        'speedups': ['pybase64'],
     },
     python_requires='>=3.7.0',
 )
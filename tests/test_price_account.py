@@ -113,6 +113,14 @@ def test_price_account_update_from(price_account_bytes: bytes, price_account: Py
     assert price_account.min_publishers == 0
 
 
+@pytest.mark.parametrize("length", [400, 1000, 1500, -50])
+def test_price_account_update_from_truncated(
+    price_account_bytes: bytes, price_account: PythPriceAccount, length: int
+):
+    with pytest.raises(ValueError, match="price components"):
+        price_account.update_from(buffer=price_account_bytes[:length], version=2, offset=0)
+
+
 def test_price_account_str(
         price_account_bytes: bytes, price_account: PythPriceAccount, solana_client: SolanaClient,
 ):
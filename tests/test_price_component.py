@@ -2,7 +2,7 @@ import pytest
 import base64
 
 from pythclient.solana import SolanaPublicKey
-from pythclient.pythaccounts import PythPriceComponent, PythPriceInfo, PythPriceStatus
+from pythclient.pythaccounts import PythPriceComponent, PythPriceInfo, PythPriceStatus, _parse_price_components
 
 
 @pytest.fixture
@@ -56,6 +56,30 @@ def test_deserialise_null_publisher_key(price_component: PythPriceComponent, pri
     assert actual is None
 
 
+def test_deserialise_unpublished_price_info(price_component: PythPriceComponent, price_component_bytes: bytes):
+    # Zero out the latest price info (the last 32 bytes of the buffer)
+    sparse_bytes = price_component_bytes[:-PythPriceInfo.LENGTH] + bytes(PythPriceInfo.LENGTH)
+    first = PythPriceComponent.deserialise(sparse_bytes, exponent=price_component.exponent)
+    second = PythPriceComponent.deserialise(sparse_bytes, exponent=price_component.exponent)
+
+    assert first is not None and second is not None
+    assert first.last_aggregate_price_info == price_component.last_aggregate_price_info
+    assert first.latest_price_info == PythPriceInfo(0, 0, PythPriceStatus.UNKNOWN, 0, price_component.exponent)
+    # only the bulk price account parser shares unpublished price infos
+    assert first.latest_price_info is not second.latest_price_info
+
+
+def test_parse_price_components_shares_unpublished_price_info(
+    price_component: PythPriceComponent, price_component_bytes: bytes
+):
+    # Two components whose latest price infos were never published
+    sparse_bytes = price_component_bytes[:-PythPriceInfo.LENGTH] + bytes(PythPriceInfo.LENGTH)
+    first, second = _parse_price_components(sparse_bytes * 2, 0, 2, exponent=price_component.exponent)
+
+    assert first.latest_price_info == PythPriceInfo(0, 0, PythPriceStatus.UNKNOWN, 0, price_component.exponent)
+    assert first.latest_price_info is second.latest_price_info
+
+
 def test_price_component_to_json(price_component: PythPriceComponent, price_component_bytes: bytes):
 
     ignore_keys = set()
@@ -97,6 +97,30 @@ def test_price_info_deserialise(price_info_trading, price_info_trading_bytes):
     assert asdict(actual) == asdict(price_info_trading)
 
 
+def test_price_info_deserialise_empty():
+    actual = PythPriceInfo.deserialise(buffer=bytes(PythPriceInfo.LENGTH), offset=0, exponent=-8)
+    assert asdict(actual) == asdict(PythPriceInfo(0, 0, PythPriceStatus.UNKNOWN, 0, -8))
+    # only the component parser shares unpublished price infos
+    assert PythPriceInfo.deserialise(buffer=bytes(PythPriceInfo.LENGTH), offset=0, exponent=-8) is not actual
+
+
+def test_price_info_deserialise_unknown_status(price_info_trading_bytes):
+    # status is the u32 after price (i64) and confidence interval (u64)
+    bad_bytes = price_info_trading_bytes[:16] + (42).to_bytes(4, "little") + price_info_trading_bytes[20:]
+    actual = PythPriceInfo.deserialise(buffer=bad_bytes, offset=0, exponent=-8)
+    assert actual.price_status == PythPriceStatus.UNKNOWN
+
+
+def test_price_info_lazy_price(price_info_trading):
+    assert "price" not in price_info_trading.__dict__
+    assert "confidence_interval" not in price_info_trading.__dict__
+    assert price_info_trading.price == 596.09162
+    assert price_info_trading.confidence_interval == 0.43078500000000003
+    assert "price" in price_info_trading.__dict__
+    with pytest.raises(AttributeError):
+        price_info_trading.unknown_attribute
+
+
 def test_price_info_str(price_info_trading):
     expected = "PythPriceInfo status PythPriceStatus.TRADING price 596.09162"
     assert str(price_info_trading) == expected
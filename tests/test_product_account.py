@@ -8,6 +8,8 @@ from pythclient.exceptions import NotLoadedException
 from pythclient.solana import SolanaPublicKey, SolanaClient
 from pythclient.pythaccounts import (
     _VERSION_2,
+    PythPriceAccount,
+    PythPriceType,
     PythProductAccount,
     _read_attribute_string,
 )
@@ -103,6 +105,29 @@ def test_product_account_update_from_invalid_attr_key(
     assert dict(actual) == dict(product_account)
 
 
+@pytest.mark.asyncio
+async def test_refresh_prices_batches_loaded_accounts(
+    product_account: PythProductAccount, solana_client: SolanaClient
+):
+    old_price = PythPriceAccount(product_account.first_price_account_key, solana_client, product=product_account)
+    old_price.price_type = PythPriceType.PRICE
+    product_account._prices = {PythPriceType.PRICE: old_price}
+
+    async def fake_update_accounts(accounts):
+        for account in accounts:
+            account.price_type = PythPriceType.PRICE
+
+    with mock.patch.object(SolanaClient, "update_accounts", side_effect=fake_update_accounts) as update_accounts, \
+            mock.patch.object(PythPriceAccount, "update") as update:
+        prices = await product_account.refresh_prices()
+
+    update_accounts.assert_called_once()
+    update.assert_not_called()
+    assert list(prices.keys()) == [PythPriceType.PRICE]
+    assert prices[PythPriceType.PRICE].key == old_price.key
+    assert prices[PythPriceType.PRICE] is not old_price
+
+
 @pytest.mark.parametrize("func", [str, repr])
 def test_human_readable(func: Callable, product_account: PythProductAccount):
     expected = (
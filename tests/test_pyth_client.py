@@ -383,3 +383,37 @@ def test_create_watch_session(
 ) -> None:
     ws = pyth_client.create_watch_session()
     assert isinstance(ws, WatchSession)
+
+
+@pytest.mark.asyncio
+async def test_get_all_accounts_loads_prices_in_batch(
+    pyth_client: PythClient,
+    mock_get_account_info: AsyncMock,
+    mocker: MockerFixture,
+    product_account: PythProductAccount,
+    price_account: PythPriceAccount,
+    product_account_bytes: bytes
+) -> None:
+    for product in await pyth_client.get_products():
+        product.update_from(buffer=product_account_bytes, version=_VERSION_2)
+    mock_get_account_info.reset_mock()
+
+    async def fake_update_accounts(accounts: Sequence[PythPriceAccount]) -> None:
+        for account in accounts:
+            account.update_with_rpc_response(96866599, {'data': [PRICE_ACCOUNT_B64_DATA, 'base64']})
+
+    update_accounts = mocker.patch.object(SolanaClient, 'update_accounts', side_effect=fake_update_accounts)
+
+    accounts = await pyth_client.get_all_accounts()
+    # missing prices are loaded with getMultipleAccounts, not one getAccountInfo
+    # call per price account
+    update_accounts.assert_called_once()
+    mock_get_account_info.assert_not_called()
+    assert accounts[1].key == product_account.key
+    assert accounts[2].key == price_account.key
+    assert accounts[2].price_type == PythPriceType.PRICE
+
+    # prices that are already loaded are left alone
+    accounts_again = await pyth_client.get_all_accounts()
+    update_accounts.assert_called_once()
+    assert accounts_again[2] is accounts[2]